@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from ..database.models import User
+from ..storage import BaseStorage, UserRecord, get_storage
 from ..core.security import get_password_hash, verify_password, create_access_token
 from ..api.deps import get_current_user
 from pydantic import BaseModel, EmailStr
@@ -9,9 +9,9 @@ from typing import Optional
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.get("/check-username/{username}")
-async def check_username(username: str):
+async def check_username(username: str, storage: BaseStorage = Depends(get_storage)):
     """Check if username is available"""
-    existing = await User.find_one(User.username == username)
+    existing = await storage.get_user_by_username(username)
     return {"available": existing is None, "username": username}
 
 class UserSignup(BaseModel):
@@ -25,9 +25,9 @@ class Token(BaseModel):
     username: str
 
 @router.post("/signup", response_model=Token)
-async def signup(user_in: UserSignup):
+async def signup(user_in: UserSignup, storage: BaseStorage = Depends(get_storage)):
     # Check if username already exists
-    existing = await User.find_one(User.username == user_in.username)
+    existing = await storage.get_user_by_username(user_in.username)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,27 +36,26 @@ async def signup(user_in: UserSignup):
     
     # Check if email already exists (if provided)
     if user_in.email:
-        existing_email = await User.find_one(User.email == user_in.email)
+        existing_email = await storage.get_user_by_email(user_in.email)
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
     
-    new_user = User(
+    new_user = await storage.create_user(UserRecord(
         email=user_in.email or f"{user_in.username}@local",
         username=user_in.username,
         hashed_password=get_password_hash(user_in.password)
-    )
-    await new_user.insert()
+    ))
     
     access_token = create_access_token(data={"sub": str(new_user.id)})
     return {"access_token": access_token, "token_type": "bearer", "username": new_user.username}
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), storage: BaseStorage = Depends(get_storage)):
     # Login using username (not email)
-    user = await User.find_one(User.username == form_data.username)
+    user = await storage.get_user_by_username(form_data.username)
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,7 +73,8 @@ class ChangePasswordRequest(BaseModel):
 @router.post("/change-password")
 async def change_password(
     request: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
 ):
     # Verify current password
     if not verify_password(request.current_password, current_user.hashed_password):
@@ -92,6 +92,6 @@ async def change_password(
     
     # Update password
     current_user.hashed_password = get_password_hash(request.new_password)
-    await current_user.save()
+    await storage.update_user(current_user)
     
     return {"message": "Password changed successfully"}
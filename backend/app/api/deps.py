@@ -1,31 +1,39 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from ..core.security import decode_access_token
-from ..database.models import User
-from beanie import PydanticObjectId
+from ..storage import BaseStorage, UserRecord, get_storage
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+async def get_user_from_token(token: str, storage: BaseStorage) -> Optional[UserRecord]:
+    """Resolve a bearer token to its user, or None if it is not valid"""
     payload = decode_access_token(token)
     if payload is None:
         print(f"Token decoding failed for token: {token[:10]}...")
-        raise credentials_exception
-    
+        return None
+
     user_id: str = payload.get("sub")
     if user_id is None:
         print("No 'sub' in token payload")
-        raise credentials_exception
-        
-    user = await User.get(user_id)
+        return None
+
+    user = await storage.get_user(user_id)
     if user is None:
         print(f"User not found in DB for ID: {user_id}")
-        raise credentials_exception
-        
+        return None
+
+    return user
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    storage: BaseStorage = Depends(get_storage)
+) -> UserRecord:
+    user = await get_user_from_token(token, storage)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
@@ -0,0 +1,147 @@
+import datetime
+import json
+import zlib
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+from fastapi.responses import StreamingResponse
+
+from ..storage import BaseStorage, UserRecord, ConversationRecord, get_storage
+from ..api.deps import get_current_user
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+# Number of conversations per bulk insert
+IMPORT_BATCH_SIZE = 500
+# Bytes read from the upload per iteration
+READ_CHUNK_SIZE = 64 * 1024
+# Guard against a single unterminated line eating all memory
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+
+async def _export_lines(storage: BaseStorage, user_id: str) -> AsyncIterator[bytes]:
+    # The storage yields conversations one at a time; the generator is only
+    # advanced when the client has consumed the previous chunk.
+    async for conv in storage.iter_conversations(user_id):
+        yield (conv.model_dump_json(exclude={"user_id"}) + "\n").encode("utf-8")
+
+
+async def _gzip(lines: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for line in lines:
+        data = compressor.compress(line)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/export")
+async def export_conversations(
+    gzip: bool = False,
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    """Stream all of the user's conversations as NDJSON (one conversation per line)"""
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    body = _export_lines(storage, current_user.id)
+    filename = f"conversations-{stamp}.ndjson"
+    if gzip:
+        body = _gzip(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    else:
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Yield the upload's bytes, transparently decompressing gzip"""
+    chunk = await file.read(READ_CHUNK_SIZE)
+    decompressor = None
+    if chunk[:2] == b"\x1f\x8b":
+        decompressor = zlib.decompressobj(47)  # wbits=47 -> auto-detect gzip/zlib header
+    while chunk:
+        yield decompressor.decompress(chunk) if decompressor is not None else chunk
+        chunk = await file.read(READ_CHUNK_SIZE)
+    if decompressor is not None:
+        yield decompressor.flush()
+
+
+async def _read_lines(file: UploadFile) -> AsyncIterator[bytes]:
+    """Yield raw lines from an upload"""
+    buffer = bytearray()
+    async for chunk in _read_chunks(file):
+        # Only the newly appended bytes can hold a line break, so a long line is
+        # scanned once overall instead of once per chunk.
+        scan = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", scan)) != -1:
+            yield bytes(buffer[start:end])
+            start = scan = end + 1
+        if start:
+            del buffer[:start]
+        if len(buffer) > MAX_LINE_BYTES:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Line too long in import file")
+    if buffer:
+        yield bytes(buffer)
+
+
+def _to_conversation(raw: dict, user_id: str) -> ConversationRecord:
+    if not isinstance(raw, dict):
+        raise ValueError("expected a JSON object")
+    # Never trust ids or ownership from the file: everything lands under the importing user
+    raw.pop("id", None)
+    raw.pop("_id", None)
+    raw["user_id"] = user_id
+    messages = raw.get("messages") or []
+    if not isinstance(messages, list):
+        raise ValueError("messages must be a list")
+    for i, message in enumerate(messages):
+        # Checked here so both backends reject the same rows instead of one storing them
+        if not isinstance(message, dict):
+            raise ValueError(f"message {i} must be an object")
+        if not isinstance(message.get("role"), str) or not isinstance(message.get("content"), str):
+            raise ValueError(f"message {i} needs string role and content")
+        # Exports carry ISO strings; messages are stored with real datetimes
+        ts = message.get("timestamp")
+        message["timestamp"] = datetime.datetime.fromisoformat(ts) if ts else datetime.datetime.utcnow()
+    return ConversationRecord(**raw)
+
+
+@router.post("/import")
+async def import_conversations(
+    file: UploadFile = File(...),
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    """Import conversations from an NDJSON (optionally gzip) export"""
+    user_id = current_user.id
+    batch = []
+    imported = 0
+    line_no = 0
+
+    async for line in _read_lines(file):
+        line_no += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            batch.append(_to_conversation(json.loads(line), user_id))
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid conversation on line {line_no} ({imported} already imported): {e}"
+            )
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            imported += await storage.insert_conversations(batch)
+            batch = []
+
+    if batch:
+        imported += await storage.insert_conversations(batch)
+
+    return {"message": "Import completed", "imported": imported}
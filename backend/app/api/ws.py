@@ -0,0 +1,234 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+from starlette.websockets import WebSocketState
+from pydantic import ValidationError
+
+from ..models import ChatRequest
+from ..providers import create_provider
+from ..storage import BaseStorage, UserRecord, get_storage
+from ..api.deps import get_user_from_token
+from ..core.chat import start_turn, finish_turn
+
+router = APIRouter(tags=["chat"])
+
+# Seconds between server pings; a client silent for HEARTBEAT_TIMEOUT is dropped
+HEARTBEAT_INTERVAL = 20
+HEARTBEAT_TIMEOUT = 2 * HEARTBEAT_INTERVAL
+AUTH_TIMEOUT = 10
+# Concurrent generations per socket
+MAX_STREAMS = 8
+# Outgoing frames buffered before generators block (backpressure on upstream reads)
+SEND_QUEUE_SIZE = 64
+
+# Protocol (JSON frames)
+#   client -> server: {"type": "auth", "token"}                    (unless ?token= is given)
+#                     {"type": "chat", "stream_id", ...ChatRequest}
+#                     {"type": "cancel", "stream_id"}
+#                     {"type": "ping"} / {"type": "pong"}
+#   server -> client: {"type": "ready"}
+#                     {"type": "start", "stream_id", "conversationId"}
+#                     {"type": "chunk", "stream_id", "content"}
+#                     {"type": "done" | "cancelled", "stream_id"}
+#                     {"type": "error", "stream_id"?, "error"}
+#                     {"type": "ping"} / {"type": "pong"}
+
+
+class ChatSession:
+    """One authenticated socket multiplexing several generations by stream id"""
+
+    def __init__(self, websocket: WebSocket, user: UserRecord, storage: BaseStorage):
+        self.websocket = websocket
+        self.user = user
+        self.storage = storage
+        self.streams: Dict[str, asyncio.Task] = {}
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        # Set once the socket is going away and the writer no longer drains the outbox
+        self.closing = False
+
+    async def send(self, frame: dict) -> None:
+        await self.outbox.put(frame)
+
+    async def writer(self) -> None:
+        # Single writer so concurrent streams never interleave sends on the socket
+        while True:
+            frame = await self.outbox.get()
+            await self.websocket.send_json(frame)
+
+    async def heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await self.send({"type": "ping"})
+
+    async def reader(self) -> None:
+        while True:
+            try:
+                message = await asyncio.wait_for(_receive_json(self.websocket), HEARTBEAT_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"WebSocket heartbeat timeout for {self.user.username}")
+                return
+            except ValueError as e:
+                await self.send({"type": "error", "error": str(e)})
+                continue
+            if not isinstance(message, dict):
+                await self.send({"type": "error", "error": "Frames must be JSON objects"})
+                continue
+
+            kind = message.get("type")
+            if kind == "chat":
+                await self.start_stream(message)
+            elif kind == "cancel":
+                stream_id = _stream_id(message)
+                if stream_id is None:
+                    await self.send({"type": "error", "error": "stream_id must be a non-empty string"})
+                    continue
+                task = self.streams.get(stream_id)
+                if task:
+                    task.cancel()
+            elif kind == "ping":
+                await self.send({"type": "pong"})
+            elif kind == "pong":
+                pass
+            else:
+                await self.send({"type": "error", "error": f"Unknown message type: {kind}"})
+
+    async def start_stream(self, message: dict) -> None:
+        stream_id = _stream_id(message)
+        if stream_id is None:
+            await self.send({"type": "error", "error": "stream_id must be a non-empty string"})
+            return
+        if stream_id in self.streams:
+            await self.send({"type": "error", "stream_id": stream_id, "error": "Duplicate stream_id"})
+            return
+        if len(self.streams) >= MAX_STREAMS:
+            await self.send({"type": "error", "stream_id": stream_id, "error": "Too many concurrent streams"})
+            return
+        try:
+            request = ChatRequest(**{k: v for k, v in message.items() if k not in ("type", "stream_id")})
+        except ValidationError as e:
+            await self.send({"type": "error", "stream_id": stream_id, "error": str(e)})
+            return
+
+        task = asyncio.create_task(self.generate(stream_id, request))
+        self.streams[stream_id] = task
+        task.add_done_callback(lambda _: self.streams.pop(stream_id, None))
+
+    async def generate(self, stream_id: str, request: ChatRequest) -> None:
+        """Run one stream; it always ends with exactly one done, cancelled or error frame"""
+        try:
+            await self._generate(stream_id, request)
+        except asyncio.CancelledError:
+            frame = {"type": "cancelled", "stream_id": stream_id}
+        except Exception as e:
+            frame = {"type": "error", "stream_id": stream_id, "error": str(e)}
+        else:
+            frame = {"type": "done", "stream_id": stream_id}
+
+        if self.closing:
+            # The writer is gone with the socket; don't block on a queue nobody drains
+            try:
+                self.outbox.put_nowait(frame)
+            except asyncio.QueueFull:
+                pass
+        else:
+            await self.send(frame)
+
+    async def _generate(self, stream_id: str, request: ChatRequest) -> None:
+        provider = create_provider(request.provider, request.apiKey, request.baseUrl)
+        if not provider:
+            raise ValueError("Unsupported provider")
+        conv = await start_turn(self.storage, self.user, request)
+
+        await self.send({"type": "start", "stream_id": stream_id, "conversationId": str(conv.id)})
+
+        bot_content = ""
+        chunks = provider.stream_chat(request.messages, request.model, **(request.parameters or {}))
+        try:
+            async for chunk in chunks:
+                bot_content += chunk
+                await self.send({"type": "chunk", "stream_id": stream_id, "content": chunk})
+        except asyncio.CancelledError:
+            # Drop the upstream request first, then keep what was generated so far
+            await chunks.aclose()
+            await finish_turn(self.storage, conv.id, bot_content, cancelled=True)
+            raise
+        finally:
+            # Closing the generator runs the provider's cleanup, which closes the upstream request
+            await chunks.aclose()
+
+        await finish_turn(self.storage, conv.id, bot_content)
+
+    async def run(self) -> int:
+        """Serve the socket until it ends; returns the close code to send if it is still open"""
+        tasks = [asyncio.create_task(c) for c in (self.reader(), self.writer(), self.heartbeat())]
+        close_code = status.WS_1001_GOING_AWAY  # heartbeat timeout
+        try:
+            # Any of them ending (disconnect, timeout, send failure) ends the session
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is not None and not isinstance(error, WebSocketDisconnect):
+                    print(f"WebSocket session for {self.user.username} failed: {error!r}")
+                    close_code = status.WS_1011_INTERNAL_ERROR
+        finally:
+            self.closing = True
+            for task in tasks:
+                task.cancel()
+            streams = list(self.streams.values())
+            for task in streams:
+                task.cancel()
+            # Let cancelled generations persist their partial replies
+            await asyncio.gather(*tasks, *streams, return_exceptions=True)
+        return close_code
+
+
+def _stream_id(message: dict) -> Optional[str]:
+    # Anything else (lists, numbers) would be unhashable or ambiguous as a dict key
+    stream_id = message.get("stream_id")
+    return stream_id if isinstance(stream_id, str) and stream_id else None
+
+
+async def _receive_json(websocket: WebSocket) -> Any:
+    # Like WebSocket.receive_json, but a binary or malformed frame is a ValueError
+    # instead of a KeyError that would take the whole socket down
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    text = message.get("text")
+    if text is None:
+        raise ValueError("Binary frames are not supported")
+    try:
+        return json.loads(text)
+    except ValueError:
+        raise ValueError("Invalid JSON")
+
+
+async def _authenticate(websocket: WebSocket, token: Optional[str], storage: BaseStorage) -> Optional[UserRecord]:
+    if token is None:
+        try:
+            message = await asyncio.wait_for(_receive_json(websocket), AUTH_TIMEOUT)
+        except (asyncio.TimeoutError, ValueError, WebSocketDisconnect):
+            return None
+        if not isinstance(message, dict) or message.get("type") != "auth":
+            return None
+        token = message.get("token")
+    if not isinstance(token, str) or not token:
+        return None
+    return await get_user_from_token(token, storage)
+
+
+@router.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket, token: Optional[str] = None, storage: BaseStorage = Depends(get_storage)):
+    await websocket.accept()
+    user = await _authenticate(websocket, token, storage)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+
+    await websocket.send_json({"type": "ready"})
+    close_code = await ChatSession(websocket, user, storage).run()
+    # Ended on our side (heartbeat timeout, internal failure): tell the client instead of leaving it hanging
+    if websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.close(code=close_code)
@@ -0,0 +1,37 @@
+import datetime
+from ..models import ChatRequest
+from ..storage import BaseStorage, ConversationRecord, UserRecord
+
+
+class ConversationNotFound(LookupError):
+    pass
+
+
+async def start_turn(storage: BaseStorage, user: UserRecord, request: ChatRequest) -> ConversationRecord:
+    """Find (or create) the user's conversation and persist the new user message"""
+    if request.conversationId:
+        conv = await storage.get_conversation(request.conversationId)
+        if not conv or conv.user_id != user.id:
+            raise ConversationNotFound("Conversation not found")
+    else:
+        conv = await storage.create_conversation(user.id, request.messages[-1].content[:50])
+
+    # Save user message (include image if present)
+    last_msg = request.messages[-1]
+    user_msg = {
+        "role": "user",
+        "content": last_msg.content,
+        "timestamp": datetime.datetime.utcnow()
+    }
+    if last_msg.image_url:
+        user_msg["image_url"] = last_msg.image_url
+    await storage.append_message(conv.id, user_msg)
+    return conv
+
+
+async def finish_turn(storage: BaseStorage, conversation_id: str, content: str, cancelled: bool = False) -> None:
+    """Persist the assistant reply; a cancelled reply keeps whatever was generated so far"""
+    assistant_msg = {"role": "assistant", "content": content, "timestamp": datetime.datetime.utcnow()}
+    if cancelled:
+        assistant_msg["cancelled"] = True
+    await storage.append_message(conversation_id, assistant_msg)
@@ -1,17 +1,19 @@
 import os
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from .models import User, Conversation
 
-async def init_db():
+async def init_db(mongodb_url: Optional[str] = None, database: Optional[str] = None) -> AsyncIOMotorClient:
     # Use environment variable or default to local mongodb
-    mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017/openchatllm")
+    mongodb_url = mongodb_url or os.getenv("MONGODB_URL", "mongodb://localhost:27017/openchatllm")
     
     client = AsyncIOMotorClient(mongodb_url)
     
-    # Initialize Beanie with the models
+    # Initialize Beanie with the models (database defaults to the one named in the URL)
     await init_beanie(
-        database=client.get_database(),
+        database=client.get_database(database),
         document_models=[User, Conversation]
     )
     print(f"MongoDB Initialized at {mongodb_url}")
+    return client
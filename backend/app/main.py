@@ -1,33 +1,89 @@
-import datetime
+import asyncio
 import json
 import os
+import time
+from contextlib import asynccontextmanager, suppress
 from typing import Optional, List, Dict, Any
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Request, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from .models import ChatMessage, ChatResponse, ChatRequest, SettingsUpdate
-from .providers import get_provider
-from .database.init import init_db
-from .database.models import User, Conversation
+from .models import ChatMessage, ChatResponse, ChatRequest, CompareRequest, CompareTarget, SettingsUpdate
+from .providers import PROVIDERS, create_provider, prewarm_providers
+from .storage import BaseStorage, UserRecord, StorageNotReady, init_storage, close_storage, get_storage
 from .api.auth import router as auth_router
+from .api.transfer import router as transfer_router
+from .api.ws import router as ws_router
 from .api.deps import get_current_user
+from .core.chat import ConversationNotFound, start_turn, finish_turn
 
-app = FastAPI(title="OpenChatLLM API")
+# Storage often comes up after the API (compose, k8s), so init is retried with
+# exponential backoff before startup is declared failed
+STORAGE_INIT_ATTEMPTS = int(os.getenv("STORAGE_INIT_ATTEMPTS", "8"))
+STORAGE_INIT_BACKOFF = 1.0
+STORAGE_INIT_MAX_BACKOFF = 30.0
 
-@app.on_event("startup")
-async def on_startup():
-    await init_db()
+async def init_storage_with_retry():
+    delay = STORAGE_INIT_BACKOFF
+    for attempt in range(1, STORAGE_INIT_ATTEMPTS + 1):
+        try:
+            return await init_storage()
+        except Exception as e:
+            if attempt == STORAGE_INIT_ATTEMPTS:
+                raise
+            print(f"Storage init failed (attempt {attempt}/{STORAGE_INIT_ATTEMPTS}): {e}; retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STORAGE_INIT_MAX_BACKOFF)
+
+def _startup_error() -> Optional[BaseException]:
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is None or not warm_up.done() or warm_up.cancelled():
+        return None
+    return warm_up.exception()
+
+async def warm_up(app: FastAPI):
+    try:
+        await init_storage_with_retry()
+        # Provider SDK imports are blocking, keep them off the event loop
+        warmed = await asyncio.to_thread(prewarm_providers)
+    except Exception as e:
+        print(f"Startup failed: {e}")
+        raise
+    if warmed:
+        print(f"Pre-warmed providers: {', '.join(warmed)}")
+    app.state.ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connecting storage and pre-warming run in the background so the server starts
+    # accepting connections right away; /ready stays 503 until they are done.
+    app.state.ready = False
+    app.state.warm_up = asyncio.create_task(warm_up(app))
+    yield
+    app.state.warm_up.cancel()
+    # A failed warm-up was already reported through /health and /ready
+    with suppress(asyncio.CancelledError, Exception):
+        await app.state.warm_up
+    await close_storage()
+
+app = FastAPI(title="OpenChatLLM API", lifespan=lifespan)
+
+@app.exception_handler(StorageNotReady)
+async def storage_not_ready_handler(request: Request, exc: StorageNotReady):
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Service is starting up"})
 
 app.include_router(auth_router)
+# Registered before /conversations/{conversation_id} so /export is not captured as an id
+app.include_router(transfer_router)
+app.include_router(ws_router)
 
 
 @app.get("/user/settings")
-async def get_user_settings(current_user: User = Depends(get_current_user)):
+async def get_user_settings(current_user: UserRecord = Depends(get_current_user)):
     return {
         "api_keys": current_user.api_keys,
         "base_urls": current_user.base_urls,
@@ -36,7 +92,11 @@ async def get_user_settings(current_user: User = Depends(get_current_user)):
     }
 
 @app.patch("/user/settings")
-async def update_user_settings(settings: SettingsUpdate, current_user: User = Depends(get_current_user)):
+async def update_user_settings(
+    settings: SettingsUpdate,
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
     print(f"Updating settings for user {current_user.username}: {settings}")
     if settings.api_keys is not None:
         current_user.api_keys = {**current_user.api_keys, **settings.api_keys}
@@ -47,7 +107,7 @@ async def update_user_settings(settings: SettingsUpdate, current_user: User = De
     if settings.selected_model is not None:
         current_user.selected_model = settings.selected_model
     
-    await current_user.save()
+    await storage.update_user(current_user)
     print(f"Settings saved for {current_user.username}")
     return {"message": "Settings updated successfully"}
 
@@ -61,18 +121,31 @@ app.add_middleware(
 
 @app.get("/")
 async def root():
-    return {"message": "OpenChatLLM API is running on MongoDB"}
+    return {"message": f"OpenChatLLM API is running on {get_storage().name}"}
+
+@app.get("/health")
+async def health():
+    # Liveness: fails once startup has given up, so the orchestrator restarts the process
+    error = _startup_error()
+    if error:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Startup failed: {error}")
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    # Readiness: storage is connected and pre-warming is done
+    error = _startup_error()
+    if error:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Startup failed: {error}")
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Not ready")
+    return {"status": "ready"}
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest, current_user: User = Depends(get_current_user)):
-    provider_class = get_provider(request.provider)
-    if not provider_class:
+async def chat_endpoint(request: ChatRequest, current_user: UserRecord = Depends(get_current_user)):
+    provider = create_provider(request.provider, request.apiKey, request.baseUrl)
+    if not provider:
         raise HTTPException(status_code=400, detail="Unsupported provider")
-    
-    if request.provider == "vllm":
-        provider = provider_class(api_key=request.apiKey, base_url=request.baseUrl)
-    else:
-        provider = provider_class(api_key=request.apiKey)
         
     try:
         return await provider.chat(request.messages, request.model, **(request.parameters or {}))
@@ -80,42 +153,22 @@ async def chat_endpoint(request: ChatRequest, current_user: User = Depends(get_c
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/chat/stream")
-async def chat_stream_endpoint(request: ChatRequest, current_user: User = Depends(get_current_user)):
-    provider_class = get_provider(request.provider)
-    if not provider_class:
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    provider = create_provider(request.provider, request.apiKey, request.baseUrl)
+    if not provider:
         raise HTTPException(status_code=400, detail="Unsupported provider")
-    
-    if request.provider == "vllm":
-        provider = provider_class(api_key=request.apiKey, base_url=request.baseUrl)
-    else:
-        provider = provider_class(api_key=request.apiKey)
+
+    # Before the response starts, so an unknown conversation is a real 404
+    try:
+        conv = await start_turn(storage, current_user, request)
+    except ConversationNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
     async def event_generator():
-        # Find or create conversation in MongoDB
-        if request.conversationId:
-            conv = await Conversation.get(request.conversationId)
-            if not conv or conv.user_id != str(current_user.id):
-                raise HTTPException(status_code=404, detail="Conversation not found")
-        else:
-            conv = Conversation(
-                user_id=str(current_user.id),
-                title=request.messages[-1].content[:50],
-                messages=[]
-            )
-            await conv.insert()
-        
-        # Save user message (include image if present)
-        last_msg = request.messages[-1]
-        user_msg = {
-            "role": "user", 
-            "content": last_msg.content, 
-            "timestamp": datetime.datetime.utcnow()
-        }
-        if last_msg.image_url:
-            user_msg["image_url"] = last_msg.image_url
-        conv.messages.append(user_msg)
-        await conv.save()
-
         # Send conversation ID to frontend
         yield f"data: {json.dumps({'conversationId': str(conv.id)})}\n\n"
 
@@ -130,10 +183,7 @@ async def chat_stream_endpoint(request: ChatRequest, current_user: User = Depend
                 yield f"data: {json.dumps({'content': chunk})}\n\n"
             
             # Save assistant message
-            assistant_msg = {"role": "assistant", "content": bot_content, "timestamp": datetime.datetime.utcnow()}
-            conv.messages.append(assistant_msg)
-            conv.updated_at = datetime.datetime.utcnow()
-            await conv.save()
+            await finish_turn(storage, conv.id, bot_content)
 
             yield "data: [DONE]\n\n"
         except Exception as e:
@@ -141,17 +191,91 @@ async def chat_stream_endpoint(request: ChatRequest, current_user: User = Depend
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
+# Max targets in one /chat/compare call
+MAX_COMPARE_TARGETS = 8
+
+async def _run_compare_target(index: int, target: CompareTarget, messages: List[ChatMessage], timeout: float, queue: asyncio.Queue):
+    """Stream one target into the shared queue and finish with its own stats event"""
+    start = time.perf_counter()
+    # Time left for waiting on the provider; only upstream reads draw from it
+    budget = timeout
+    # stream_chat yields text deltas of provider-specific size, so this counts chunks, not tokens
+    stats = {"status": "ok", "ttft_ms": None, "latency_ms": None, "chunks": 0, "characters": 0}
+    chunks = None
+    try:
+        # Built here so a target that fails to construct (missing SDK, no API key) only fails itself
+        # In a thread: the first use of a provider imports its SDK, which would otherwise
+        # stall every other target's stream on the event loop
+        provider = await asyncio.to_thread(create_provider, target.provider, target.apiKey, target.baseUrl)
+        chunks = provider.stream_chat(messages, target.model, **(target.parameters or {}))
+
+        while True:
+            # A slow client backing up the shared queue must not make a fast provider look timed out
+            read_start = time.perf_counter()
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), budget)
+            except StopAsyncIteration:
+                break
+            budget -= time.perf_counter() - read_start
+            if stats["ttft_ms"] is None:
+                stats["ttft_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            stats["chunks"] += 1
+            stats["characters"] += len(chunk)
+            await queue.put({"target": index, "content": chunk})
+    except asyncio.TimeoutError:
+        stats["status"] = "timeout"
+    except Exception as e:
+        stats["status"] = "error"
+        stats["error"] = str(e)
+    finally:
+        if chunks is not None:
+            await chunks.aclose()
+    stats["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    await queue.put({"target": index, "stats": stats})
+
+@app.post("/chat/compare")
+async def chat_compare_endpoint(request: CompareRequest, current_user: UserRecord = Depends(get_current_user)):
+    if not request.targets:
+        raise HTTPException(status_code=400, detail="At least one target is required")
+    if len(request.targets) > MAX_COMPARE_TARGETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_TARGETS} targets are allowed")
+    for target in request.targets:
+        if target.provider.lower() not in PROVIDERS:
+            raise HTTPException(status_code=400, detail=f"Unsupported provider: {target.provider}")
+
+    async def event_generator():
+        # Bounded so a slow client throttles the providers instead of buffering their output
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        tasks = [
+            asyncio.create_task(_run_compare_target(
+                i, target, request.messages,
+                target.timeout if target.timeout is not None else request.timeout,
+                queue
+            ))
+            for i, target in enumerate(request.targets)
+        ]
+        yield f"data: {json.dumps({'targets': [{'target': i, 'provider': t.provider, 'model': t.model} for i, t in enumerate(request.targets)]})}\n\n"
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if "stats" in event:
+                    remaining -= 1
+                yield f"data: {json.dumps(event)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            # Client went away: stop every upstream generation still running
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
 @app.get("/models")
 async def list_models_endpoint(provider: str, apiKey: Optional[str] = None, baseUrl: Optional[str] = None):
-    provider_class = get_provider(provider)
-    if not provider_class:
+    provider_instance = create_provider(provider, apiKey, baseUrl)
+    if not provider_instance:
         raise HTTPException(status_code=400, detail="Unsupported provider")
     
-    if provider == "vllm":
-        provider_instance = provider_class(api_key=apiKey, base_url=baseUrl)
-    else:
-        provider_instance = provider_class(api_key=apiKey)
-    
     try:
         models = await provider_instance.list_models()
         return {"models": models}
@@ -159,8 +283,11 @@ async def list_models_endpoint(provider: str, apiKey: Optional[str] = None, base
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/conversations")
-async def list_conversations(current_user: User = Depends(get_current_user)):
-    conversations = await Conversation.find(Conversation.user_id == str(current_user.id)).sort("-updated_at").to_list()
+async def list_conversations(
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    conversations = await storage.list_conversations(current_user.id)
     # Serialize with string IDs
     return [
         {
@@ -173,9 +300,13 @@ async def list_conversations(current_user: User = Depends(get_current_user)):
     ]
 
 @app.get("/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str, current_user: User = Depends(get_current_user)):
-    conversation = await Conversation.get(conversation_id)
-    if not conversation or conversation.user_id != str(current_user.id):
+async def get_conversation(
+    conversation_id: str,
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    conversation = await storage.get_conversation(conversation_id)
+    if not conversation or conversation.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Conversation not found")
     # Return full conversation with messages
     return {
@@ -186,20 +317,29 @@ async def get_conversation(conversation_id: str, current_user: User = Depends(ge
     }
 
 @app.delete("/conversations/{conversation_id}")
-async def delete_conversation(conversation_id: str, current_user: User = Depends(get_current_user)):
-    conversation = await Conversation.get(conversation_id)
-    if not conversation or conversation.user_id != str(current_user.id):
+async def delete_conversation(
+    conversation_id: str,
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    conversation = await storage.get_conversation(conversation_id)
+    if not conversation or conversation.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    await conversation.delete()
+    await storage.delete_conversation(conversation_id)
     return {"message": "Deleted successfully"}
 
 @app.patch("/conversations/{conversation_id}")
-async def rename_conversation(conversation_id: str, title: str, current_user: User = Depends(get_current_user)):
-    conversation = await Conversation.get(conversation_id)
-    if not conversation or conversation.user_id != str(current_user.id):
+async def rename_conversation(
+    conversation_id: str,
+    title: str,
+    current_user: UserRecord = Depends(get_current_user),
+    storage: BaseStorage = Depends(get_storage)
+):
+    conversation = await storage.get_conversation(conversation_id)
+    if not conversation or conversation.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    await storage.rename_conversation(conversation_id, title)
     conversation.title = title
-    await conversation.save()
     return conversation
 
 if __name__ == "__main__":
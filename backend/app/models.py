@@ -28,3 +28,16 @@ class SettingsUpdate(BaseModel):
     base_urls: Optional[Dict[str, str]] = None
     selected_provider: Optional[str] = None
     selected_model: Optional[str] = None
+
+class CompareTarget(BaseModel):
+    provider: str
+    model: str
+    apiKey: Optional[str] = None
+    baseUrl: Optional[str] = None
+    parameters: Optional[Dict[str, Any]] = None
+    timeout: Optional[float] = None  # Seconds; falls back to CompareRequest.timeout
+
+class CompareRequest(BaseModel):
+    messages: List[ChatMessage]
+    targets: List[CompareTarget]
+    timeout: float = 120
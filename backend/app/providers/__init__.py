@@ -1,13 +1,56 @@
-from .openai_p import OpenAIProvider
-from .anthropic_p import AnthropicProvider
-from .gemini_p import GeminiProvider
-from .vllm_p import VLLMProvider
-
-def get_provider(name: str):
-    providers = {
-        "openai": OpenAIProvider,
-        "anthropic": AnthropicProvider,
-        "gemini": GeminiProvider,
-        "vllm": VLLMProvider
-    }
-    return providers.get(name.lower())
+import importlib
+import os
+from typing import Dict, List, Optional, Type
+from .base import BaseProvider
+
+# name -> (module, class). Modules are only imported when a provider is first
+# requested, so a deployment that only talks to vLLM never loads anthropic or google.genai.
+PROVIDERS = {
+    "openai": (".openai_p", "OpenAIProvider"),
+    "anthropic": (".anthropic_p", "AnthropicProvider"),
+    "gemini": (".gemini_p", "GeminiProvider"),
+    "vllm": (".vllm_p", "VLLMProvider"),
+}
+
+_loaded: Dict[str, Type[BaseProvider]] = {}
+
+
+def get_provider(name: str) -> Optional[Type[BaseProvider]]:
+    name = name.lower()
+    provider_class = _loaded.get(name)
+    if provider_class is None:
+        spec = PROVIDERS.get(name)
+        if spec is None:
+            return None
+        module_name, class_name = spec
+        module = importlib.import_module(module_name, __name__)
+        provider_class = _loaded[name] = getattr(module, class_name)
+    return provider_class
+
+
+def create_provider(name: str, api_key: Optional[str] = None, base_url: Optional[str] = None) -> Optional[BaseProvider]:
+    """Instantiate a provider by name; only vLLM takes a base URL. None if the name is unknown."""
+    provider_class = get_provider(name)
+    if provider_class is None:
+        return None
+    if name.lower() == "vllm":
+        return provider_class(api_key=api_key, base_url=base_url)
+    return provider_class(api_key=api_key)
+
+
+def prewarm_providers(names: Optional[List[str]] = None) -> List[str]:
+    """Import provider SDKs ahead of the first request.
+
+    Defaults to the comma separated PREWARM_PROVIDERS env var ("all" loads every provider).
+    """
+    if names is None:
+        names = [n.strip() for n in os.getenv("PREWARM_PROVIDERS", "").split(",") if n.strip()]
+    if "all" in names:
+        names = list(PROVIDERS)
+    warmed = []
+    for name in names:
+        if get_provider(name) is None:
+            print(f"Unknown provider in PREWARM_PROVIDERS: {name}")
+            continue
+        warmed.append(name.lower())
+    return warmed
@@ -46,9 +46,13 @@ class OpenAIProvider(BaseProvider):
             stream=True,
             **kwargs
         )
-        async for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Runs on aclose() too, so a cancelled generation drops the upstream HTTP response
+            await stream.close()
 
     async def list_models(self) -> List[str]:
         models = await self.client.models.list()
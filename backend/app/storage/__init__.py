@@ -0,0 +1,44 @@
+import os
+from typing import Optional
+from .base import BaseStorage, UserRecord, ConversationRecord
+
+_storage: Optional[BaseStorage] = None
+
+
+class StorageNotReady(RuntimeError):
+    """Raised when storage is requested before init_storage() has finished"""
+
+
+def create_storage(backend: Optional[str] = None) -> BaseStorage:
+    """Build the storage selected by STORAGE_BACKEND (mongo or sqlite)"""
+    backend = (backend or os.getenv("STORAGE_BACKEND", "mongo")).lower()
+    # Imported lazily so a SQLite deployment never loads motor/beanie and vice versa
+    if backend == "mongo":
+        from .mongo import MongoStorage
+        return MongoStorage()
+    if backend == "sqlite":
+        from .sqlite import SQLiteStorage
+        return SQLiteStorage(os.getenv("SQLITE_PATH", "./openchatllm.db"))
+    raise ValueError(f"Unsupported storage backend: {backend}")
+
+
+async def init_storage(backend: Optional[str] = None) -> BaseStorage:
+    global _storage
+    storage = create_storage(backend)
+    await storage.init()
+    # Only published once connected, so get_storage() never hands out a half-initialized backend
+    _storage = storage
+    return storage
+
+
+async def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
+
+
+def get_storage() -> BaseStorage:
+    if _storage is None:
+        raise StorageNotReady("Storage is not initialized")
+    return _storage
@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from pydantic import BaseModel, Field
+
+
+class UserRecord(BaseModel):
+    """Backend-agnostic view of a user"""
+    id: Optional[str] = None
+    email: Optional[str] = None
+    username: str
+    hashed_password: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # User Preferences
+    api_keys: dict = Field(default_factory=dict)
+    base_urls: dict = Field(default_factory=lambda: {"vllm": "http://localhost:8000/v1"})
+    selected_provider: str = "openai"
+    selected_model: str = "gpt-4o"
+
+
+class ConversationRecord(BaseModel):
+    """Backend-agnostic view of a conversation; messages are {role, content, timestamp, ...}"""
+    id: Optional[str] = None
+    user_id: str
+    title: str = "New Chat"
+    messages: List[dict] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BaseStorage(ABC):
+    name: str = "base"
+
+    @abstractmethod
+    async def init(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    # Users
+
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        pass
+
+    @abstractmethod
+    async def get_user_by_username(self, username: str) -> Optional[UserRecord]:
+        pass
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        pass
+
+    @abstractmethod
+    async def create_user(self, user: UserRecord) -> UserRecord:
+        pass
+
+    @abstractmethod
+    async def update_user(self, user: UserRecord) -> None:
+        pass
+
+    # Conversations
+
+    @abstractmethod
+    async def list_conversations(self, user_id: str) -> List[ConversationRecord]:
+        """Conversations of a user, newest first, without messages"""
+        pass
+
+    @abstractmethod
+    async def get_conversation(self, conversation_id: str) -> Optional[ConversationRecord]:
+        pass
+
+    @abstractmethod
+    async def create_conversation(self, user_id: str, title: str) -> ConversationRecord:
+        pass
+
+    @abstractmethod
+    async def append_message(self, conversation_id: str, message: dict) -> None:
+        """Append one message and bump updated_at"""
+        pass
+
+    @abstractmethod
+    async def rename_conversation(self, conversation_id: str, title: str) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_conversation(self, conversation_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def iter_conversations(self, user_id: str) -> AsyncIterator[ConversationRecord]:
+        """Stream full conversations of a user, newest first, without loading them all"""
+        pass
+
+    @abstractmethod
+    async def insert_conversations(self, conversations: List[ConversationRecord]) -> int:
+        """Bulk insert new conversations (ids are assigned by the backend)"""
+        pass
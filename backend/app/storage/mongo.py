@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from bson import ObjectId
+from ..database.init import init_db
+from ..database.models import User, Conversation
+from .base import BaseStorage, UserRecord, ConversationRecord
+
+# Mongo cursor batch size used when streaming conversations
+EXPORT_BATCH_SIZE = 100
+
+
+def _oid(value: str) -> Optional[ObjectId]:
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+
+def _user_record(user: User) -> UserRecord:
+    return UserRecord(id=str(user.id), **user.model_dump(exclude={"id", "revision_id"}))
+
+
+def _conversation_record(doc: dict) -> ConversationRecord:
+    return ConversationRecord(id=str(doc.pop("_id")), **doc)
+
+
+class MongoStorage(BaseStorage):
+    """MongoDB storage through Beanie documents"""
+    name = "MongoDB"
+
+    def __init__(self, url: Optional[str] = None, database: Optional[str] = None):
+        self.url = url
+        self.database = database
+        self.client = None
+
+    async def init(self) -> None:
+        self.client = await init_db(self.url, self.database)
+
+    async def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    # Users
+
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        oid = _oid(user_id)
+        user = await User.get(oid) if oid else None
+        return _user_record(user) if user else None
+
+    async def get_user_by_username(self, username: str) -> Optional[UserRecord]:
+        user = await User.find_one(User.username == username)
+        return _user_record(user) if user else None
+
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        user = await User.find_one(User.email == email)
+        return _user_record(user) if user else None
+
+    async def create_user(self, user: UserRecord) -> UserRecord:
+        doc = User(**user.model_dump(exclude={"id"}))
+        await doc.insert()
+        return _user_record(doc)
+
+    async def update_user(self, user: UserRecord) -> None:
+        await User.get_motor_collection().update_one(
+            {"_id": ObjectId(user.id)},
+            {"$set": user.model_dump(exclude={"id"})}
+        )
+
+    # Conversations
+
+    async def list_conversations(self, user_id: str) -> List[ConversationRecord]:
+        cursor = Conversation.get_motor_collection().find(
+            {"user_id": user_id},
+            projection={"messages": 0},
+            sort=[("updated_at", -1)],
+        )
+        return [_conversation_record(doc) async for doc in cursor]
+
+    async def get_conversation(self, conversation_id: str) -> Optional[ConversationRecord]:
+        oid = _oid(conversation_id)
+        doc = await Conversation.get_motor_collection().find_one({"_id": oid}) if oid else None
+        return _conversation_record(doc) if doc else None
+
+    async def create_conversation(self, user_id: str, title: str) -> ConversationRecord:
+        conv = Conversation(user_id=user_id, title=title, messages=[])
+        await conv.insert()
+        return ConversationRecord(id=str(conv.id), **conv.model_dump(exclude={"id", "revision_id"}))
+
+    async def append_message(self, conversation_id: str, message: dict) -> None:
+        # $push instead of save() so the whole message array is not rewritten each turn
+        await Conversation.get_motor_collection().update_one(
+            {"_id": ObjectId(conversation_id)},
+            {"$push": {"messages": message}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+
+    async def rename_conversation(self, conversation_id: str, title: str) -> None:
+        await Conversation.get_motor_collection().update_one(
+            {"_id": ObjectId(conversation_id)},
+            {"$set": {"title": title}}
+        )
+
+    async def delete_conversation(self, conversation_id: str) -> None:
+        await Conversation.get_motor_collection().delete_one({"_id": ObjectId(conversation_id)})
+
+    async def iter_conversations(self, user_id: str) -> AsyncIterator[ConversationRecord]:
+        # Iterate the raw motor cursor so only one batch is held in memory at a time
+        cursor = Conversation.get_motor_collection().find(
+            {"user_id": user_id},
+            sort=[("updated_at", -1)],
+            batch_size=EXPORT_BATCH_SIZE,
+        )
+        try:
+            async for doc in cursor:
+                yield _conversation_record(doc)
+        finally:
+            await cursor.close()
+
+    async def insert_conversations(self, conversations: List[ConversationRecord]) -> int:
+        if not conversations:
+            return 0
+        result = await Conversation.get_motor_collection().insert_many(
+            [c.model_dump(exclude={"id"}) for c in conversations]
+        )
+        return len(result.inserted_ids)
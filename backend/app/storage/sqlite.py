@@ -0,0 +1,259 @@
+import asyncio
+import json
+import secrets
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+import aiosqlite
+from .base import BaseStorage, UserRecord, ConversationRecord
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# prepares each one once and reuses it for every call.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT,
+    hashed_password TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    api_keys TEXT NOT NULL,
+    base_urls TEXT NOT NULL,
+    selected_provider TEXT NOT NULL,
+    selected_model TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_users_email ON users (email);
+
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_conversations_user ON conversations (user_id, updated_at);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_messages_conversation ON messages (conversation_id, id);
+"""
+
+USER_COLUMNS = "id, username, email, hashed_password, created_at, api_keys, base_urls, selected_provider, selected_model"
+SELECT_USER_BY_ID = f"SELECT {USER_COLUMNS} FROM users WHERE id = ?"
+SELECT_USER_BY_USERNAME = f"SELECT {USER_COLUMNS} FROM users WHERE username = ?"
+SELECT_USER_BY_EMAIL = f"SELECT {USER_COLUMNS} FROM users WHERE email = ? LIMIT 1"
+INSERT_USER = f"INSERT INTO users ({USER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+UPDATE_USER = (
+    "UPDATE users SET username = ?, email = ?, hashed_password = ?, api_keys = ?, base_urls = ?, "
+    "selected_provider = ?, selected_model = ? WHERE id = ?"
+)
+
+CONVERSATION_COLUMNS = "id, user_id, title, created_at, updated_at"
+SELECT_CONVERSATIONS_BY_USER = (
+    f"SELECT {CONVERSATION_COLUMNS} FROM conversations WHERE user_id = ? ORDER BY updated_at DESC"
+)
+SELECT_CONVERSATION = f"SELECT {CONVERSATION_COLUMNS} FROM conversations WHERE id = ?"
+INSERT_CONVERSATION = f"INSERT INTO conversations ({CONVERSATION_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+TOUCH_CONVERSATION = "UPDATE conversations SET updated_at = ? WHERE id = ?"
+RENAME_CONVERSATION = "UPDATE conversations SET title = ? WHERE id = ?"
+DELETE_CONVERSATION = "DELETE FROM conversations WHERE id = ?"
+
+SELECT_MESSAGES = (
+    "SELECT role, content, timestamp, extra FROM messages WHERE conversation_id = ? ORDER BY id"
+)
+INSERT_MESSAGE = (
+    "INSERT INTO messages (conversation_id, role, content, timestamp, extra) VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def _new_id() -> str:
+    # Same shape as a Mongo ObjectId so ids look alike across backends
+    return secrets.token_hex(12)
+
+
+def _ts(value: datetime) -> str:
+    # Fixed-width naive UTC so lexical ORDER BY matches chronological order
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+def _user_from_row(row) -> UserRecord:
+    return UserRecord(
+        id=row[0],
+        username=row[1],
+        email=row[2],
+        hashed_password=row[3],
+        created_at=datetime.fromisoformat(row[4]),
+        api_keys=json.loads(row[5]),
+        base_urls=json.loads(row[6]),
+        selected_provider=row[7],
+        selected_model=row[8],
+    )
+
+
+def _conversation_from_row(row, messages: Optional[List[dict]] = None) -> ConversationRecord:
+    return ConversationRecord(
+        id=row[0],
+        user_id=row[1],
+        title=row[2],
+        created_at=datetime.fromisoformat(row[3]),
+        updated_at=datetime.fromisoformat(row[4]),
+        messages=messages or [],
+    )
+
+
+def _message_params(conversation_id: str, message: dict) -> tuple:
+    extra = {k: v for k, v in message.items() if k not in ("role", "content", "timestamp")}
+    ts = message.get("timestamp") or datetime.utcnow()
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    return (
+        conversation_id,
+        message["role"],
+        message.get("content") or "",
+        _ts(ts),
+        json.dumps(extra) if extra else None,
+    )
+
+
+def _message_from_row(row) -> dict:
+    message = {"role": row[0], "content": row[1], "timestamp": datetime.fromisoformat(row[2])}
+    if row[3]:
+        message.update(json.loads(row[3]))
+    return message
+
+
+class SQLiteStorage(BaseStorage):
+    """Single-node storage on one SQLite file in WAL mode"""
+    name = "SQLite"
+
+    def __init__(self, path: str = "./openchatllm.db"):
+        self.path = path
+        self.db: Optional[aiosqlite.Connection] = None
+        # One connection is shared; writers take this lock so multi-statement
+        # transactions from concurrent requests never interleave.
+        self._write_lock = asyncio.Lock()
+
+    async def init(self) -> None:
+        # isolation_level=None -> autocommit; transactions are opened explicitly
+        self.db = await aiosqlite.connect(self.path, isolation_level=None, cached_statements=256)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("PRAGMA synchronous=NORMAL")
+        await self.db.execute("PRAGMA foreign_keys=ON")
+        await self.db.executescript(SCHEMA)
+        print(f"SQLite Initialized at {self.path}")
+
+    async def close(self) -> None:
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    async def _fetchone(self, sql: str, params: tuple):
+        async with self.db.execute(sql, params) as cursor:
+            return await cursor.fetchone()
+
+    async def _messages(self, conversation_id: str) -> List[dict]:
+        async with self.db.execute(SELECT_MESSAGES, (conversation_id,)) as cursor:
+            return [_message_from_row(row) async for row in cursor]
+
+    # Users
+
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        row = await self._fetchone(SELECT_USER_BY_ID, (user_id,))
+        return _user_from_row(row) if row else None
+
+    async def get_user_by_username(self, username: str) -> Optional[UserRecord]:
+        row = await self._fetchone(SELECT_USER_BY_USERNAME, (username,))
+        return _user_from_row(row) if row else None
+
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        row = await self._fetchone(SELECT_USER_BY_EMAIL, (email,))
+        return _user_from_row(row) if row else None
+
+    async def create_user(self, user: UserRecord) -> UserRecord:
+        user = user.model_copy(update={"id": _new_id()})
+        async with self._write_lock:
+            await self.db.execute(INSERT_USER, (
+                user.id, user.username, user.email, user.hashed_password, _ts(user.created_at),
+                json.dumps(user.api_keys), json.dumps(user.base_urls),
+                user.selected_provider, user.selected_model,
+            ))
+        return user
+
+    async def update_user(self, user: UserRecord) -> None:
+        async with self._write_lock:
+            await self.db.execute(UPDATE_USER, (
+                user.username, user.email, user.hashed_password,
+                json.dumps(user.api_keys), json.dumps(user.base_urls),
+                user.selected_provider, user.selected_model, user.id,
+            ))
+
+    # Conversations
+
+    async def list_conversations(self, user_id: str) -> List[ConversationRecord]:
+        async with self.db.execute(SELECT_CONVERSATIONS_BY_USER, (user_id,)) as cursor:
+            return [_conversation_from_row(row) async for row in cursor]
+
+    async def get_conversation(self, conversation_id: str) -> Optional[ConversationRecord]:
+        row = await self._fetchone(SELECT_CONVERSATION, (conversation_id,))
+        if not row:
+            return None
+        return _conversation_from_row(row, await self._messages(conversation_id))
+
+    async def create_conversation(self, user_id: str, title: str) -> ConversationRecord:
+        conv = ConversationRecord(id=_new_id(), user_id=user_id, title=title)
+        async with self._write_lock:
+            await self.db.execute(INSERT_CONVERSATION, (
+                conv.id, conv.user_id, conv.title, _ts(conv.created_at), _ts(conv.updated_at),
+            ))
+        return conv
+
+    async def append_message(self, conversation_id: str, message: dict) -> None:
+        async with self._write_lock:
+            await self.db.execute("BEGIN")
+            try:
+                await self.db.execute(INSERT_MESSAGE, _message_params(conversation_id, message))
+                await self.db.execute(TOUCH_CONVERSATION, (_ts(datetime.utcnow()), conversation_id))
+                await self.db.execute("COMMIT")
+            except BaseException:
+                await self.db.execute("ROLLBACK")
+                raise
+
+    async def rename_conversation(self, conversation_id: str, title: str) -> None:
+        async with self._write_lock:
+            await self.db.execute(RENAME_CONVERSATION, (title, conversation_id))
+
+    async def delete_conversation(self, conversation_id: str) -> None:
+        # Messages go with it through ON DELETE CASCADE
+        async with self._write_lock:
+            await self.db.execute(DELETE_CONVERSATION, (conversation_id,))
+
+    async def iter_conversations(self, user_id: str) -> AsyncIterator[ConversationRecord]:
+        async with self.db.execute(SELECT_CONVERSATIONS_BY_USER, (user_id,)) as cursor:
+            async for row in cursor:
+                yield _conversation_from_row(row, await self._messages(row[0]))
+
+    async def insert_conversations(self, conversations: List[ConversationRecord]) -> int:
+        if not conversations:
+            return 0
+        async with self._write_lock:
+            await self.db.execute("BEGIN")
+            try:
+                for conv in conversations:
+                    conv_id = _new_id()
+                    await self.db.execute(INSERT_CONVERSATION, (
+                        conv_id, conv.user_id, conv.title, _ts(conv.created_at), _ts(conv.updated_at),
+                    ))
+                    await self.db.executemany(
+                        INSERT_MESSAGE, [_message_params(conv_id, m) for m in conv.messages]
+                    )
+                await self.db.execute("COMMIT")
+            except BaseException:
+                await self.db.execute("ROLLBACK")
+                raise
+        return len(conversations)
@@ -0,0 +1,77 @@
+"""Measure cold import time and resident memory per provider.
+
+Each target is imported in a fresh interpreter so results are not skewed by
+modules that an earlier target already loaded.
+
+Usage (from the backend directory):
+    python scripts/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON line
+PROBE = r"""
+import importlib, json, sys, time
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+target = sys.argv[1]
+import app.providers as providers  # the registry itself must stay cheap
+before = rss_kb()
+start = time.perf_counter()
+if target == "app.main":
+    importlib.import_module("app.main")
+else:
+    providers.get_provider(target)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb() - before, "total_rss_kb": rss_kb()}))
+"""
+
+
+def measure(target: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, target],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    sys.path.insert(0, BACKEND_DIR)
+    from app.providers import PROVIDERS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target")
+    args = parser.parse_args()
+
+    print(f"{'target':<12} {'import ms (median)':>20} {'+RSS MB':>10} {'total RSS MB':>14}")
+    for target in [*PROVIDERS, "app.main"]:
+        samples = [measure(target) for _ in range(args.runs)]
+        errors = [s["error"] for s in samples if "error" in s]
+        if errors:
+            print(f"{target:<12} error: {errors[0]}")
+            continue
+        ms = statistics.median(s["seconds"] for s in samples) * 1000
+        rss = statistics.median(s["rss_kb"] for s in samples) / 1024
+        total = statistics.median(s["total_rss_kb"] for s in samples) / 1024
+        print(f"{target:<12} {ms:>20.1f} {rss:>10.1f} {total:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.api.deps import get_current_user
+from app.storage import UserRecord, get_storage
+from app.storage.sqlite import SQLiteStorage
+
+# Tests never touch the configured database, only this one on the same server
+MONGODB_TEST_DATABASE = "openchatllm_test"
+
+
+async def _mongo_storage():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.storage.mongo import MongoStorage
+
+    url = os.getenv("MONGODB_URL", "mongodb://localhost:27017/openchatllm")
+    probe = AsyncIOMotorClient(url, serverSelectionTimeoutMS=500)
+    try:
+        await probe.admin.command("ping")
+    except Exception:
+        pytest.skip(f"MongoDB is not reachable at {url}")
+    finally:
+        probe.close()
+
+    storage = MongoStorage(url, MONGODB_TEST_DATABASE)
+    await storage.init()
+    await storage.client.drop_database(MONGODB_TEST_DATABASE)
+    # Recreate the indexes dropped with the database
+    await storage.init()
+    return storage
+
+
+@pytest.fixture(params=["sqlite", "mongo"])
+async def storage(request, tmp_path):
+    """Every test using this fixture runs once per storage backend"""
+    if request.param == "sqlite":
+        storage = SQLiteStorage(str(tmp_path / "openchatllm-test.db"))
+        await storage.init()
+    else:
+        storage = await _mongo_storage()
+    yield storage
+    if request.param == "mongo":
+        await storage.client.drop_database(MONGODB_TEST_DATABASE)
+    await storage.close()
+
+
+@pytest.fixture
+async def user(storage):
+    return await storage.create_user(UserRecord(username="alice", hashed_password="secret"))
+
+
+@pytest.fixture
+async def client(storage, user):
+    app.dependency_overrides[get_storage] = lambda: storage
+    app.dependency_overrides[get_current_user] = lambda: user
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main, providers
+from app.api.deps import get_current_user
+from app.main import app
+from app.storage import UserRecord
+
+
+class FastProvider:
+    def __init__(self, api_key=None):
+        pass
+
+    async def stream_chat(self, messages, model, **kwargs):
+        for word in ("Hello", " there"):
+            yield word
+
+
+class SlowProvider(FastProvider):
+    async def stream_chat(self, messages, model, **kwargs):
+        yield "first"
+        await asyncio.sleep(10)
+        yield "never"
+
+
+class BrokenProvider:
+    def __init__(self, api_key=None):
+        raise RuntimeError("The api_key client option must be set")
+
+
+class SlowImportProvider(FastProvider):
+    """Stands in for a provider whose SDK is imported on first use"""
+
+    def __init__(self, api_key=None, base_url=None):
+        assert base_url == "http://vllm:8000/v1"
+
+
+def _resolve(name):
+    if name == "vllm":
+        time.sleep(0.5)  # Blocking, like a cold SDK import
+        return SlowImportProvider
+    return FAKES[name]
+
+
+FAKES = {"openai": FastProvider, "anthropic": SlowProvider, "gemini": BrokenProvider}
+
+
+@pytest.fixture
+async def client():
+    # /chat/compare never touches storage, so only authentication is stubbed
+    app.dependency_overrides[get_current_user] = lambda: UserRecord(id="u1", username="alice", hashed_password="x")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def _events(response):
+    lines = [line[len("data: "):] for line in response.text.split("\n\n") if line]
+    assert lines[-1] == "[DONE]"
+    return [json.loads(line) for line in lines[:-1]]
+
+
+async def test_targets_report_independently(client, monkeypatch):
+    monkeypatch.setattr(providers, "get_provider", lambda name: FAKES[name.lower()])
+
+    response = await client.post("/chat/compare", json={
+        "messages": [{"role": "user", "content": "hi"}],
+        "targets": [
+            {"provider": "openai", "model": "a"},
+            {"provider": "anthropic", "model": "b", "timeout": 0.2},
+            {"provider": "gemini", "model": "c"},
+            {"provider": "openai", "model": "d", "timeout": 0},
+        ],
+    })
+
+    events = _events(response)
+    assert [t["model"] for t in events[0]["targets"]] == ["a", "b", "c", "d"]
+    content = {i: "".join(e["content"] for e in events if e.get("target") == i and "content" in e) for i in range(4)}
+    stats = {e["target"]: e["stats"] for e in events if "stats" in e}
+
+    assert content[0] == "Hello there"
+    assert stats[0]["status"] == "ok"
+    assert stats[0]["chunks"] == 2
+    assert stats[0]["characters"] == len("Hello there")
+    assert stats[0]["ttft_ms"] is not None
+
+    assert content[1] == "first"
+    assert stats[1]["status"] == "timeout"
+    assert stats[1]["latency_ms"] < 5000
+
+    assert stats[2]["status"] == "error"
+    assert "api_key" in stats[2]["error"]
+
+    # An explicit zero timeout is honoured, not replaced by the request default
+    assert stats[3]["status"] == "timeout"
+
+
+async def test_unknown_provider_is_rejected(client):
+    response = await client.post("/chat/compare", json={
+        "messages": [{"role": "user", "content": "hi"}],
+        "targets": [{"provider": "nope", "model": "x"}],
+    })
+    assert response.status_code == 400
+
+
+async def test_slow_consumer_does_not_count_against_timeout(monkeypatch):
+    monkeypatch.setattr(providers, "get_provider", lambda name: FastProvider)
+    queue = asyncio.Queue(maxsize=1)
+    target = main.CompareTarget(provider="openai", model="a")
+    task = asyncio.create_task(main._run_compare_target(0, target, [], 0.1, queue))
+
+    await asyncio.sleep(0.3)  # Nobody drains the queue for longer than the timeout
+    events = [await queue.get() for _ in range(3)]
+    await task
+
+    assert events[-1]["stats"]["status"] == "ok"
+    assert events[-1]["stats"]["chunks"] == 2
+
+
+async def test_cold_provider_import_does_not_stall_other_targets(client, monkeypatch):
+    monkeypatch.setattr(providers, "get_provider", lambda name: _resolve(name.lower()))
+    received = []
+
+    async with client.stream("POST", "/chat/compare", json={
+        "messages": [{"role": "user", "content": "hi"}],
+        "targets": [{"provider": "VLLM", "model": "slow-import", "baseUrl": "http://vllm:8000/v1"}, {"provider": "openai", "model": "fast"}],
+    }) as response:
+        start = time.perf_counter()
+        async for line in response.aiter_lines():
+            if line.startswith("data: {") and '"stats"' in line:
+                received.append((json.loads(line[len("data: "):]), time.perf_counter() - start))
+
+    stats = {event["target"]: (event["stats"], at) for event, at in received}
+    assert stats[0][0]["status"] == "ok"  # Upper-case VLLM still gets its base URL
+    # The fast target finishes while the cold one is still importing
+    assert stats[1][1] < stats[0][1]
+    assert stats[1][1] < 0.25
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.main import app
+
+
+async def test_ready_only_after_background_warm_up(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "openchatllm-test.db"))
+    release = threading.Event()
+    monkeypatch.setattr(main, "prewarm_providers", lambda: release.wait(5) and [])
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/health")).status_code == 200
+            assert (await client.get("/ready")).status_code == 503
+
+            release.set()
+            await app.state.warm_up
+
+            assert (await client.get("/ready")).json() == {"status": "ready"}
+            assert (await client.get("/")).json()["message"].endswith("SQLite")
+
+
+async def test_storage_init_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "openchatllm-test.db"))
+    monkeypatch.setattr(main, "STORAGE_INIT_BACKOFF", 0.01)
+    real_init = main.init_storage
+    attempts = []
+
+    async def flaky_init():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("database is still starting")
+        return await real_init()
+
+    monkeypatch.setattr(main, "init_storage", flaky_init)
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await app.state.warm_up
+
+            assert len(attempts) == 3
+            assert (await client.get("/ready")).status_code == 200
+            assert (await client.get("/health")).status_code == 200
+
+
+async def test_failed_warm_up_fails_health_and_ready(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "nope")
+    monkeypatch.setattr(main, "STORAGE_INIT_ATTEMPTS", 2)
+    monkeypatch.setattr(main, "STORAGE_INIT_BACKOFF", 0.01)
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await asyncio.wait([app.state.warm_up])
+
+            response = await client.get("/ready")
+            assert response.status_code == 503
+            assert "Unsupported storage backend" in response.json()["detail"]
+            # Liveness fails too, so the orchestrator restarts the process
+            assert (await client.get("/health")).status_code == 503
+            # Routes that need storage answer 503 instead of crashing
+            assert (await client.get("/")).status_code == 503
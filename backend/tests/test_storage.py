@@ -0,0 +1,138 @@
+"""Contract every storage backend has to satisfy; runs against SQLite and MongoDB."""
+import asyncio
+from datetime import datetime
+
+from app.storage import ConversationRecord, UserRecord
+
+MISSING_ID = "0" * 24  # well-formed for both backends, never assigned
+
+
+def _msg(role, content, **extra):
+    return {"role": role, "content": content, "timestamp": datetime.utcnow(), **extra}
+
+
+async def test_user_lookup(storage, user):
+    assert user.id
+    assert (await storage.get_user(user.id)).username == "alice"
+    assert (await storage.get_user_by_username("alice")).id == user.id
+    assert await storage.get_user_by_username("bob") is None
+    assert await storage.get_user_by_email("nobody@example.com") is None
+
+
+async def test_get_user_unknown_or_malformed_id(storage, user):
+    assert await storage.get_user(MISSING_ID) is None
+    assert await storage.get_user("not-an-id") is None
+
+
+async def test_create_and_update_user(storage):
+    created = await storage.create_user(UserRecord(username="bob", email="bob@example.com", hashed_password="pw"))
+    assert (await storage.get_user_by_email("bob@example.com")).id == created.id
+
+    created.api_keys = {"openai": "sk-test"}
+    created.selected_provider = "vllm"
+    created.hashed_password = "new-pw"
+    await storage.update_user(created)
+
+    stored = await storage.get_user(created.id)
+    assert stored.api_keys == {"openai": "sk-test"}
+    assert stored.selected_provider == "vllm"
+    assert stored.hashed_password == "new-pw"
+    assert stored.base_urls == {"vllm": "http://localhost:8000/v1"}
+
+
+async def test_conversation_round_trip(storage, user):
+    conv = await storage.create_conversation(user.id, "Hello")
+    await storage.append_message(conv.id, _msg("user", "hi", image_url="data:image/png;base64,AAAA"))
+    await storage.append_message(conv.id, _msg("assistant", "hello"))
+
+    stored = await storage.get_conversation(conv.id)
+    assert stored.user_id == user.id
+    assert stored.title == "Hello"
+    assert [(m["role"], m["content"]) for m in stored.messages] == [("user", "hi"), ("assistant", "hello")]
+    assert stored.messages[0]["image_url"] == "data:image/png;base64,AAAA"
+    assert "image_url" not in stored.messages[1]
+    assert isinstance(stored.messages[0]["timestamp"], datetime)
+
+
+async def test_get_conversation_unknown_or_malformed_id(storage, user):
+    assert await storage.get_conversation(MISSING_ID) is None
+    assert await storage.get_conversation("not-an-id") is None
+
+
+async def test_append_message_bumps_updated_at(storage, user):
+    conv = await storage.create_conversation(user.id, "Chat")
+    before = (await storage.get_conversation(conv.id)).updated_at
+    await asyncio.sleep(0.01)
+
+    await storage.append_message(conv.id, _msg("user", "hi"))
+
+    assert (await storage.get_conversation(conv.id)).updated_at > before
+
+
+async def test_list_conversations_newest_first_without_messages(storage, user):
+    other = await storage.create_user(UserRecord(username="bob", hashed_password="pw"))
+    first = await storage.create_conversation(user.id, "First")
+    await asyncio.sleep(0.01)
+    second = await storage.create_conversation(user.id, "Second")
+    await storage.create_conversation(other.id, "Not mine")
+    await storage.append_message(first.id, _msg("user", "hi"))
+
+    listed = await storage.list_conversations(user.id)
+
+    assert [c.id for c in listed] == [first.id, second.id]
+    assert all(c.messages == [] for c in listed)
+
+
+async def test_rename_conversation(storage, user):
+    conv = await storage.create_conversation(user.id, "Old")
+    await storage.rename_conversation(conv.id, "New")
+    assert (await storage.get_conversation(conv.id)).title == "New"
+
+
+async def test_delete_conversation_removes_messages(storage, user):
+    conv = await storage.create_conversation(user.id, "Doomed")
+    await storage.append_message(conv.id, _msg("user", "hi"))
+    kept = await storage.create_conversation(user.id, "Kept")
+    await storage.append_message(kept.id, _msg("user", "still here"))
+
+    await storage.delete_conversation(conv.id)
+
+    assert await storage.get_conversation(conv.id) is None
+    assert [c.id for c in await storage.list_conversations(user.id)] == [kept.id]
+    assert len((await storage.get_conversation(kept.id)).messages) == 1
+    if storage.name == "SQLite":
+        async with storage.db.execute("SELECT COUNT(*) FROM messages WHERE conversation_id = ?", (conv.id,)) as cursor:
+            assert (await cursor.fetchone())[0] == 0
+
+
+async def test_insert_conversations_assigns_new_ids(storage, user):
+    existing = await storage.create_conversation(user.id, "Existing")
+    records = [
+        ConversationRecord(id=existing.id, user_id=user.id, title="Copy", messages=[_msg("user", "a"), _msg("assistant", "b")]),
+        ConversationRecord(user_id=user.id, title="Empty"),
+    ]
+
+    assert await storage.insert_conversations(records) == 2
+    assert await storage.insert_conversations([]) == 0
+
+    listed = await storage.list_conversations(user.id)
+    assert len(listed) == 3
+    assert len({c.id for c in listed}) == 3
+    assert (await storage.get_conversation(existing.id)).title == "Existing"
+    copy = next(c for c in listed if c.title == "Copy")
+    assert [m["content"] for m in (await storage.get_conversation(copy.id)).messages] == ["a", "b"]
+
+
+async def test_iter_conversations_streams_full_documents(storage, user):
+    other = await storage.create_user(UserRecord(username="bob", hashed_password="pw"))
+    older = await storage.create_conversation(user.id, "Older")
+    await storage.append_message(older.id, _msg("user", "one"))
+    await asyncio.sleep(0.01)
+    newer = await storage.create_conversation(user.id, "Newer")
+    await storage.append_message(newer.id, _msg("user", "two"))
+    await storage.create_conversation(other.id, "Not mine")
+
+    streamed = [c async for c in storage.iter_conversations(user.id)]
+
+    assert [c.id for c in streamed] == [newer.id, older.id]
+    assert [c.messages[0]["content"] for c in streamed] == ["two", "one"]
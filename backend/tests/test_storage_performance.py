@@ -0,0 +1,29 @@
+"""Timed append/read paths per backend; run with -s to see the numbers."""
+import time
+from datetime import datetime
+
+APPENDS = 500
+READS = 100
+# Loose ceilings that only catch pathological regressions (e.g. rewriting the whole
+# conversation on every append), not tuned to any particular machine.
+MAX_APPEND_MS = 20
+MAX_READ_MS = 50
+
+
+async def test_append_and_read_latency(storage, user):
+    conv = await storage.create_conversation(user.id, "Benchmark")
+
+    start = time.perf_counter()
+    for i in range(APPENDS):
+        await storage.append_message(conv.id, {"role": "user", "content": f"message {i} " * 20, "timestamp": datetime.utcnow()})
+    append_ms = (time.perf_counter() - start) * 1000 / APPENDS
+
+    start = time.perf_counter()
+    for _ in range(READS):
+        stored = await storage.get_conversation(conv.id)
+    read_ms = (time.perf_counter() - start) * 1000 / READS
+
+    print(f"\n{storage.name}: append {append_ms:.3f} ms/msg, read {read_ms:.3f} ms/conversation of {APPENDS} messages")
+    assert len(stored.messages) == APPENDS
+    assert append_ms < MAX_APPEND_MS
+    assert read_ms < MAX_READ_MS
@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+
+from app.api import transfer
+
+
+async def _seed(storage, user, count):
+    ids = []
+    for i in range(count):
+        conv = await storage.create_conversation(user.id, f"Chat {i}")
+        await storage.append_message(conv.id, {"role": "user", "content": f"question {i}", "timestamp": datetime.utcnow()})
+        await storage.append_message(conv.id, {"role": "assistant", "content": f"answer {i}", "timestamp": datetime.utcnow()})
+        ids.append(conv.id)
+        await asyncio.sleep(0.005)  # Mongo keeps millisecond precision; keep updated_at distinct
+    return ids
+
+
+def _upload(data: bytes, name="conversations.ndjson"):
+    return {"file": (name, data, "application/octet-stream")}
+
+
+async def test_export_ndjson(client, storage, user):
+    await _seed(storage, user, 3)
+
+    response = await client.get("/conversations/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.content.decode().splitlines()
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert first["title"] == "Chat 2"  # newest first
+    assert "user_id" not in first
+    assert [m["content"] for m in first["messages"]] == ["question 2", "answer 2"]
+
+
+async def test_gzip_round_trip_across_batches(client, storage, user, monkeypatch):
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 2)
+    original = await _seed(storage, user, 5)  # two full batches and a partial one
+
+    exported = await client.get("/conversations/export", params={"gzip": True})
+    assert exported.headers["content-type"] == "application/gzip"
+    assert len(gzip.decompress(exported.content).splitlines()) == 5
+
+    response = await client.post("/conversations/import", files=_upload(exported.content, "backup.ndjson.gz"))
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 5
+    conversations = await storage.list_conversations(user.id)
+    assert len(conversations) == 10
+    imported = [c for c in conversations if c.id not in original]
+    assert sorted(c.title for c in imported) == [f"Chat {i}" for i in range(5)]
+    conv = await storage.get_conversation(imported[0].id)
+    assert [m["role"] for m in conv.messages] == ["user", "assistant"]
+    assert all(isinstance(m["timestamp"], datetime) for m in conv.messages)
+
+
+async def test_import_exact_batch_size(client, storage, user, monkeypatch):
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 2)
+    lines = [json.dumps({"title": f"Chat {i}", "messages": []}) for i in range(2)]
+
+    response = await client.post("/conversations/import", files=_upload(("\n".join(lines) + "\n").encode()))
+
+    assert response.json()["imported"] == 2
+    assert len(await storage.list_conversations(user.id)) == 2
+
+
+async def test_import_skips_blank_lines_and_parses_timestamps(client, storage, user):
+    line = json.dumps({
+        "id": "ignored",
+        "user_id": "someone-else",
+        "title": "Imported",
+        "messages": [{"role": "user", "content": "hi", "timestamp": "2024-05-01T12:30:00"}],
+    })
+    body = f"\n{line}\n\n   \n".encode()
+
+    response = await client.post("/conversations/import", files=_upload(body))
+
+    assert response.json()["imported"] == 1
+    [conv] = await storage.list_conversations(user.id)
+    assert conv.id != "ignored"
+    conv = await storage.get_conversation(conv.id)
+    assert conv.user_id == user.id
+    assert conv.messages[0]["timestamp"] == datetime(2024, 5, 1, 12, 30)
+
+
+async def test_import_malformed_line_reports_line_number(client, storage, user):
+    good = json.dumps({"title": "Good", "messages": []})
+    body = f"{good}\n\n{{not json\n{good}\n".encode()
+
+    response = await client.post("/conversations/import", files=_upload(body))
+
+    assert response.status_code == 400
+    assert "line 3" in response.json()["detail"]
+
+
+async def test_import_rejects_invalid_messages(client, storage, user):
+    good = json.dumps({"title": "Good", "messages": [{"role": "user", "content": "hi"}]})
+    for bad in (
+        {"title": "No role", "messages": [{"content": "hi"}]},
+        {"title": "Bad content", "messages": [{"role": "user", "content": 5}]},
+        {"title": "Not a list", "messages": "hi"},
+        ["not", "an", "object"],
+    ):
+        body = f"{good}\n{json.dumps(bad)}\n".encode()
+
+        response = await client.post("/conversations/import", files=_upload(body))
+
+        assert response.status_code == 400
+        assert "line 2" in response.json()["detail"]
+
+
+async def test_import_long_lines_across_chunks(client, storage, user):
+    image = "data:image/png;base64," + "A" * (8 * transfer.READ_CHUNK_SIZE * 16)  # ~8 MB, many reads
+    lines = [
+        json.dumps({"title": "Image", "messages": [{"role": "user", "content": "look", "image_url": image}]}),
+        json.dumps({"title": "Small", "messages": []}),
+    ]
+    raw = ("\n".join(lines) + "\n").encode()
+
+    start = time.perf_counter()
+    response = await client.post("/conversations/import", files=_upload(gzip.compress(raw)))
+    elapsed = time.perf_counter() - start
+
+    assert response.json()["imported"] == 2
+    image_conv = next(c for c in await storage.list_conversations(user.id) if c.title == "Image")
+    assert (await storage.get_conversation(image_conv.id)).messages[0]["image_url"] == image
+    assert elapsed < 5
@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import providers
+from app.api import ws
+from app.main import app
+
+
+class FakeProvider:
+    """Streams tokens until it is closed, recording that cleanup ran"""
+    closed = False
+
+    def __init__(self, api_key=None):
+        pass
+
+    async def stream_chat(self, messages, model, **kwargs):
+        try:
+            while True:
+                yield "tok "
+                await asyncio.sleep(0.01)
+        finally:
+            FakeProvider.closed = True
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "openchatllm-test.db"))
+    monkeypatch.delenv("PREWARM_PROVIDERS", raising=False)
+    monkeypatch.setattr(providers, "get_provider", lambda name: FakeProvider)
+    FakeProvider.closed = False
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 5
+        while client.get("/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        yield client
+
+
+@pytest.fixture
+def token(client):
+    return client.post("/auth/signup", json={"username": "alice", "password": "secret"}).json()["access_token"]
+
+
+def _chat(stream_id):
+    return {"type": "chat", "stream_id": stream_id, "provider": "fake", "model": "m", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def _receive_until(socket, kind):
+    frames = []
+    while not frames or frames[-1]["type"] != kind:
+        frames.append(socket.receive_json())
+    return frames
+
+
+def test_rejects_bad_token(client):
+    with client.websocket_connect("/ws/chat?token=nope") as socket:
+        with pytest.raises(WebSocketDisconnect):
+            socket.receive_json()
+
+
+def test_bad_frames_do_not_kill_the_socket(client, token):
+    with client.websocket_connect(f"/ws/chat?token={token}") as socket:
+        assert socket.receive_json() == {"type": "ready"}
+
+        socket.send_json([])
+        assert socket.receive_json() == {"type": "error", "error": "Frames must be JSON objects"}
+        socket.send_text('"x"')
+        assert socket.receive_json()["type"] == "error"
+        socket.send_text("{not json")
+        assert socket.receive_json() == {"type": "error", "error": "Invalid JSON"}
+        socket.send_bytes(b"\x00")
+        assert socket.receive_json() == {"type": "error", "error": "Binary frames are not supported"}
+
+        socket.send_json({"type": "ping"})
+        assert socket.receive_json() == {"type": "pong"}
+
+
+def test_cancel_closes_upstream_and_keeps_partial_reply(client, token):
+    with client.websocket_connect("/ws/chat") as socket:
+        socket.send_json({"type": "auth", "token": token})
+        assert socket.receive_json() == {"type": "ready"}
+
+        socket.send_json(_chat("a"))
+        start = socket.receive_json()
+        assert start["type"] == "start"
+        assert socket.receive_json() == {"type": "chunk", "stream_id": "a", "content": "tok "}
+
+        socket.send_json({"type": "cancel", "stream_id": "a"})
+        assert _receive_until(socket, "cancelled")[-1] == {"type": "cancelled", "stream_id": "a"}
+
+    assert FakeProvider.closed
+    conversation = client.get(
+        f"/conversations/{start['conversationId']}", headers={"Authorization": f"Bearer {token}"}
+    ).json()
+    reply = conversation["messages"][-1]
+    assert reply["role"] == "assistant"
+    assert reply["cancelled"] is True
+    assert reply["content"].startswith("tok ")
+
+
+def test_streams_are_multiplexed(client, token):
+    with client.websocket_connect(f"/ws/chat?token={token}") as socket:
+        socket.receive_json()
+        socket.send_json(_chat("a"))
+        socket.send_json(_chat("b"))
+        socket.send_json(_chat("a"))  # duplicate id while "a" is running
+
+        frames = _receive_until(socket, "error")
+        assert frames[-1]["stream_id"] == "a"
+        for _ in range(10):
+            frames.append(socket.receive_json())
+        assert {f["stream_id"] for f in frames if f["type"] == "chunk"} == {"a", "b"}
+
+        socket.send_json({"type": "cancel", "stream_id": "a"})
+        socket.send_json({"type": "cancel", "stream_id": "b"})
+        ended = set()
+        while ended != {"a", "b"}:
+            frame = socket.receive_json()
+            if frame["type"] == "cancelled":
+                ended.add(frame["stream_id"])
+
+
+def test_non_string_stream_ids_are_rejected(client, token):
+    with client.websocket_connect(f"/ws/chat?token={token}") as socket:
+        socket.receive_json()
+
+        socket.send_json({"type": "cancel", "stream_id": [1]})
+        assert socket.receive_json() == {"type": "error", "error": "stream_id must be a non-empty string"}
+        socket.send_json({**_chat("a"), "stream_id": {"x": 1}})
+        assert socket.receive_json() == {"type": "error", "error": "stream_id must be a non-empty string"}
+
+        socket.send_json({"type": "ping"})
+        assert socket.receive_json() == {"type": "pong"}
+
+
+def test_heartbeat_timeout_closes_socket(client, token, monkeypatch):
+    monkeypatch.setattr(ws, "HEARTBEAT_TIMEOUT", 0.1)
+    with client.websocket_connect(f"/ws/chat?token={token}") as socket:
+        socket.receive_json()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            socket.receive_json()
+        assert closed.value.code == 1001
+
+
+def test_unknown_conversation_is_an_error_frame(client, token):
+    with client.websocket_connect(f"/ws/chat?token={token}") as socket:
+        socket.receive_json()
+        socket.send_json({**_chat("a"), "conversationId": "0" * 24})
+        assert socket.receive_json() == {"type": "error", "stream_id": "a", "error": "Conversation not found"}
+
+    # The SSE transport shares the same check and now answers before streaming starts
+    response = client.post(
+        "/chat/stream",
+        json={**_chat("a"), "conversationId": "0" * 24},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 404